@@ -10,108 +10,500 @@ import json
 import sys
 import os
 import re
+import contextlib
+import fnmatch
+import hashlib
+import shutil
+import sqlite3
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
+from typing import Iterator, List, Optional, Tuple, Dict, Any
 
+# Parse JSON with orjson when it is installed; hook input and ripgrep output are read on every call
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
-def search_existing_files(project_dir: str, filename: str) -> List[str]:
-    """Search for existing files with similar names."""
+# Resolved once so ripgrep is started by absolute path
+RG_EXECUTABLE = shutil.which('rg')
+
+# Maximum number of names combined into a single ripgrep alternation
+SEARCH_CHUNK_SIZE = 500
+
+# Persistent index of project files and symbols, relative to the project dir
+CACHE_DIR = Path('.claude') / 'hooks' / '.cache'
+INDEX_FILE = 'symbols.db'
+
+# Directories never descended into when walking the project without ripgrep
+EXCLUDED_DIRS = {'node_modules', '.git', '.next', 'dist', 'build'}
+
+# Maximum number of similar files collected by the fallback walk
+MAX_SIMILAR_FILES = 20
+
+# Files whose definitions are indexed, and the size above which they are skipped
+CODE_EXTENSIONS = ('.js', '.ts', '.tsx', '.jsx', '.py', '.java', '.go', '.rs', '.php')
+MAX_INDEXED_FILE_SIZE = 1024 * 1024
+
+# Maximum number of changed files passed to a single ripgrep definition scan
+SCAN_CHUNK_SIZE = 1000
+
+# Definition sites recorded in the index: (kind, name)
+DEFINITION_PATTERN = re.compile(r'\b(function|class|const|def|interface|type)\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+
+# Function/class/component names declared in the content being written, matched in a
+# single pass. Each alternative consumes only its keyword and captures the name in a
+# lookahead, so overlapping declarations such as "export const X = () =>" report every name.
+# The leading character class lets the scanner skip positions no keyword can start at.
+FUNCTION_PATTERN = re.compile('(?=[fcetidp])(?:' + '|'.join((
+    r'function\s+(?=(?P<function>[a-zA-Z_][a-zA-Z0-9_]*))',  # JavaScript/TypeScript functions
+    r'const\s+(?=(?P<arrow>[a-zA-Z_][a-zA-Z0-9_]*)\s*=.*=>)',  # Arrow functions
+    r'export\s+(?=(?:function\s+)?(?P<export>[a-zA-Z_][a-zA-Z0-9_]*))',  # Exports
+    r'class\s+(?=(?P<class>[a-zA-Z_][a-zA-Z0-9_]*))',  # Classes
+    r'interface\s+(?=(?P<interface>[a-zA-Z_][a-zA-Z0-9_]*))',  # TypeScript interfaces
+    r'type\s+(?=(?P<type>[a-zA-Z_][a-zA-Z0-9_]*))',  # TypeScript types
+    r'def\s+(?=(?P<def>[a-zA-Z_][a-zA-Z0-9_]*))',  # Python functions
+    r'public\s+(?=(?:static\s+)?(?:void\s+|[a-zA-Z_][a-zA-Z0-9_<>]*\s+)(?P<method>[a-zA-Z_][a-zA-Z0-9_]*)\s*\()',  # Java methods
+)) + ')', re.IGNORECASE | re.MULTILINE)
+
+# Names too generic to be worth searching for, including keywords captured after "export"
+COMMON_NAMES = {
+    'data', 'value', 'result', 'item', 'i', 'j', 'tmp', 'cb', 'fn', 'e', 'err',
+    'const', 'let', 'var', 'default', 'async', 'function', 'class', 'interface', 'type', 'enum', 'abstract',
+}
+MIN_NAME_LENGTH = 4
+MAX_SEARCHED_NAMES = 50
+
+# Small content without any of these keywords cannot introduce a definition
+DEFINITION_KEYWORD_PATTERN = re.compile(r'\b(?:function|class|def|const|interface|type|export|public)\s', re.IGNORECASE)
+TRIVIAL_CONTENT_SIZE = 2048
+
+# Paths that are never checked (tests, temp files, etc.)
+SKIP_PATTERN = re.compile('|'.join((
+    r'/test/', r'/tests/', r'\.test\.', r'\.spec\.',
+    r'/temp/', r'/tmp/', r'/node_modules/', r'/\.git/',
+    r'\.md$', r'\.txt$', r'\.log$'
+)), re.IGNORECASE)
+
+# Common config file suffixes (matched case-insensitively), and the extension stripped to get the base name
+CONFIG_SUFFIXES = ('.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', 'config.js', 'config.ts', 'rc')
+CONFIG_EXTENSION_PATTERN = re.compile(r'\.(json|yaml|yml|toml|ini|cfg|js|ts)$', re.IGNORECASE)
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, name TEXT, mtime REAL);
+CREATE TABLE IF NOT EXISTS symbols (name TEXT, kind TEXT, path TEXT, mtime REAL);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name);
+CREATE INDEX IF NOT EXISTS symbols_path ON symbols (path);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Filesystem probe: listing the project root slower than the threshold marks the
+# filesystem as slow (network mounts, external drives); the result is rechecked hourly
+FS_PROBE_FILE = 'fs_probe'
+SLOW_FS_THRESHOLD = 0.05
+FS_PROBE_INTERVAL = 3600
+
+# Seconds a cached file listing is trusted while top-level directories are unchanged
+LISTING_TTL = 30
+
+
+def load_gitignore(project_dir: str) -> List[str]:
+    """Load the project's top-level .gitignore patterns (negations are not supported)."""
     try:
-        # Use ripgrep to find files with similar names (if available)
-        result = subprocess.run([
-            'rg', '--files', '--glob', f'*{Path(filename).stem}*', project_dir
-        ], capture_output=True, text=True, timeout=10)
-        
-        if result.returncode == 0:
-            return [f.strip() for f in result.stdout.split('\n') if f.strip()]
+        with open(os.path.join(project_dir, '.gitignore'), encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+    except OSError:
+        return []
+    
+    return [line for line in lines if line and not line.startswith(('#', '!'))]
+
+
+def is_ignored(relative_path: str, name: str, is_dir: bool, ignore_patterns: List[str]) -> bool:
+    """Check a path against .gitignore patterns using fnmatch semantics."""
+    for pattern in ignore_patterns:
+        if pattern.endswith('/'):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip('/')
         
-        # Fallback to find command
-        result = subprocess.run([
-            'find', project_dir, '-name', f'*{Path(filename).stem}*', '-type', 'f'
-        ], capture_output=True, text=True, timeout=10)
+        # Patterns containing a slash are anchored to the project root
+        if '/' in pattern:
+            if fnmatch.fnmatch(relative_path, pattern.lstrip('/')):
+                return True
+        elif fnmatch.fnmatch(name, pattern):
+            return True
+    
+    return False
+
+
+def walk_project_files(project_dir: str, name_pattern: str = '*',
+                       max_depth: Optional[int] = None) -> Iterator[str]:
+    """Walk the project with os.scandir, pruning hidden, excluded and gitignored entries.
+
+    A max_depth of 0 only lists the project root, 1 also lists its subdirectories, etc.
+    """
+    ignore_patterns = load_gitignore(project_dir)
+    pending = [(project_dir, 0)]
+    
+    while pending:
+        directory, depth = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
         
-        if result.returncode == 0:
-            return [f.strip() for f in result.stdout.split('\n') if f.strip()]
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            relative_path = os.path.relpath(entry.path, project_dir)
+            if is_ignored(relative_path, entry.name, is_dir, ignore_patterns):
+                continue
             
-    except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
+            if is_dir:
+                if entry.name not in EXCLUDED_DIRS and (max_depth is None or depth < max_depth):
+                    pending.append((entry.path, depth + 1))
+            elif fnmatch.fnmatchcase(entry.name, name_pattern):
+                yield entry.path
+
+
+def rg_lines(args: List[str], timeout: float = 10) -> Iterator[bytes]:
+    """Run ripgrep and yield non-empty raw output lines as they are produced.
+
+    Lines are left undecoded so callers only decode the output they keep. Closing the
+    generator early terminates ripgrep. Raises TimeoutExpired if ripgrep runs longer
+    than the timeout and CalledProcessError if it reports an error.
+    """
+    if RG_EXECUTABLE is None:
+        raise FileNotFoundError('rg')
+    
+    # An absolute executable path and close_fds=False let subprocess use posix_spawn
+    process = subprocess.Popen([RG_EXECUTABLE, *args], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, close_fds=False)
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        for line in process.stdout:
+            line = line.rstrip(b'\n')
+            if line:
+                yield line
+        process.wait()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+        if process.poll() is None:
+            # The caller stopped reading before ripgrep finished
+            process.terminate()
+            process.wait()
+    
+    if process.returncode < 0:
+        raise subprocess.TimeoutExpired(process.args, timeout)
+    if process.returncode > 1:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+
+
+def list_project_files(project_dir: str) -> Optional[List[str]]:
+    """List all files in the project, honoring .gitignore."""
+    try:
+        return [os.fsdecode(line) for line in rg_lines(['--files', project_dir])]
+    except subprocess.TimeoutExpired:
+        return None
+    except (subprocess.CalledProcessError, OSError):
         pass
     
-    return []
+    # Fallback to an in-process walk when ripgrep is not available
+    return list(walk_project_files(project_dir))
+
+
+def extract_definitions(content: str) -> List[Tuple[str, str]]:
+    """Extract (name, kind) pairs for the definitions in a source file."""
+    return list({(match.group(2), match.group(1)) for match in DEFINITION_PATTERN.finditer(content)})
+
+
+def read_definitions(file_path: str) -> List[Tuple[str, str]]:
+    """Read a source file and extract its definitions, skipping unreadable or oversized files."""
+    try:
+        if os.path.getsize(file_path) > MAX_INDEXED_FILE_SIZE:
+            return []
+        with open(file_path, encoding='utf-8', errors='ignore') as f:
+            return extract_definitions(f.read())
+    except OSError:
+        return []
+
+
+def scan_definitions(file_paths: List[str]) -> Dict[str, List[Tuple[str, str]]]:
+    """Extract definitions from many files with one ripgrep pass per chunk of files."""
+    definitions = {}
+    for start in range(0, len(file_paths), SCAN_CHUNK_SIZE):
+        chunk = file_paths[start:start + SCAN_CHUNK_SIZE]
+        found = {file_path: set() for file_path in chunk}
+        try:
+            # Each output line is "<path>\0<name> <kind>" for one definition site
+            for line in rg_lines([
+                '--only-matching', '--replace', '$2 $1', '--with-filename', '--no-line-number', '--null',
+                f'--max-filesize={MAX_INDEXED_FILE_SIZE}', '-e', DEFINITION_PATTERN.pattern, '--', *chunk
+            ]):
+                file_path, _, definition = line.partition(b'\0')
+                name, _, kind = definition.decode('ascii').partition(' ')
+                found.setdefault(os.fsdecode(file_path), set()).add((name, kind))
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, OSError):
+            # Fall back to reading the files in-process
+            found = {file_path: read_definitions(file_path) for file_path in chunk}
+        
+        definitions.update((file_path, list(pairs)) for file_path, pairs in found.items())
+    
+    return definitions
+
+
+def is_slow_filesystem(project_dir: str) -> bool:
+    """Check whether the project lives on a slow filesystem, probing at most once per interval."""
+    probe_path = Path(project_dir) / CACHE_DIR / FS_PROBE_FILE
+    try:
+        if time.time() - probe_path.stat().st_mtime < FS_PROBE_INTERVAL:
+            return probe_path.read_text().strip() == 'slow'
+    except OSError:
+        pass
+    
+    start = time.perf_counter()
+    try:
+        with os.scandir(project_dir) as entries:
+            for _ in entries:
+                pass
+    except OSError:
+        return False
+    slow = time.perf_counter() - start > SLOW_FS_THRESHOLD
+    
+    try:
+        probe_path.parent.mkdir(parents=True, exist_ok=True)
+        probe_path.write_text('slow' if slow else 'fast')
+    except OSError:
+        pass
+    
+    return slow
+
+
+def open_index(project_dir: str) -> Optional[sqlite3.Connection]:
+    """Open the persistent symbol index, creating it if needed."""
+    try:
+        cache_dir = Path(project_dir) / CACHE_DIR
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        index = sqlite3.connect(str(cache_dir / INDEX_FILE), timeout=5)
+        index.executescript(INDEX_SCHEMA)
+        return index
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def listing_key(project_dir: str) -> str:
+    """Fingerprint the project root and its top-level directories by mtime."""
+    try:
+        stamps = [('.', os.stat(project_dir).st_mtime_ns)]
+        for entry in os.scandir(project_dir):
+            if not entry.name.startswith('.') and entry.is_dir(follow_symlinks=False):
+                stamps.append((entry.name, entry.stat(follow_symlinks=False).st_mtime_ns))
+    except OSError:
+        return ''
+    
+    return hashlib.sha1(repr(sorted(stamps)).encode()).hexdigest()
+
+
+def refresh_index(index: sqlite3.Connection, project_dir: str) -> bool:
+    """Re-parse files changed since the last run and drop files that were removed."""
+    indexed = dict(index.execute('SELECT path, mtime FROM files'))
+    meta = dict(index.execute('SELECT key, value FROM meta'))
+    
+    # Reuse the indexed file list instead of re-walking the tree while the layout is unchanged
+    key = listing_key(project_dir)
+    now = time.time()
+    if key and meta.get('listing_key') == key and now - float(meta.get('listing_time', 0)) < LISTING_TTL:
+        files = list(indexed)
+    else:
+        files = list_project_files(project_dir)
+        if files is None:
+            return False
+        meta.update(listing_key=key, listing_time=str(now))
+    
+    current = {}
+    for file_path in files:
+        try:
+            current[file_path] = os.stat(file_path).st_mtime
+        except OSError:
+            continue
+    
+    changed = [f for f, mtime in current.items() if indexed.get(f) != mtime]
+    removed = [(f,) for f in indexed.keys() - current.keys()]
+    
+    definitions = scan_definitions([f for f in changed if f.endswith(CODE_EXTENSIONS)])
+    
+    with index:
+        index.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', meta.items())
+        index.executemany('DELETE FROM files WHERE path = ?', removed)
+        index.executemany('DELETE FROM symbols WHERE path = ?', removed)
+        for file_path in changed:
+            mtime = current[file_path]
+            index.execute('DELETE FROM symbols WHERE path = ?', (file_path,))
+            index.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?)',
+                          (file_path, Path(file_path).name, mtime))
+            index.executemany('INSERT INTO symbols VALUES (?, ?, ?, ?)',
+                              [(name, kind, file_path, mtime) for name, kind in definitions.get(file_path, ())])
+    
+    return True
+
+
+def search_existing_files(project_dir: str, filename: str,
+                          index: Optional[sqlite3.Connection] = None,
+                          max_depth: Optional[int] = None) -> List[str]:
+    """Search for existing files with similar names, optionally only near the project root."""
+    if index is not None:
+        try:
+            rows = index.execute('SELECT path FROM files WHERE instr(name, ?) > 0 ORDER BY path',
+                                 (Path(filename).stem,))
+            return [path for path, in rows]
+        except sqlite3.Error:
+            pass  # Fall back to searching the filesystem directly
+    
+    if max_depth is not None:
+        return list(islice(walk_project_files(project_dir, f'*{Path(filename).stem}*', max_depth), MAX_SIMILAR_FILES))
+    
+    try:
+        # Use ripgrep to find files with similar names (if available), stopping once enough are found
+        with contextlib.closing(rg_lines(['--files', '--glob', f'*{Path(filename).stem}*', project_dir])) as lines:
+            return [os.fsdecode(line) for line in islice(lines, MAX_SIMILAR_FILES)]
+    except subprocess.TimeoutExpired:
+        return []
+    except (subprocess.CalledProcessError, OSError):
+        pass
+    
+    # Fallback to an in-process walk, stopping once enough matches are found
+    return list(islice(walk_project_files(project_dir, f'*{Path(filename).stem}*'), MAX_SIMILAR_FILES))
+
+
+def is_config_file(filename: str) -> bool:
+    """Check whether a file name looks like a configuration file."""
+    lowered = filename.lower()
+    return lowered.endswith(CONFIG_SUFFIXES) or '.env' in lowered
 
 
 def extract_function_names(content: str) -> List[str]:
-    """Extract function/class/component names from content."""
-    patterns = [
-        r'function\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # JavaScript/TypeScript functions
-        r'const\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=.*=>',  # Arrow functions
-        r'export\s+(?:function\s+)?([a-zA-Z_][a-zA-Z0-9_]*)',  # Exports
-        r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # Classes
-        r'interface\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # TypeScript interfaces
-        r'type\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # TypeScript types
-        r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)',  # Python functions
-        r'public\s+(?:static\s+)?(?:void\s+|[a-zA-Z_][a-zA-Z0-9_<>]*\s+)([a-zA-Z_][a-zA-Z0-9_]*)\s*\(',  # Java methods
-    ]
-    
-    names = []
-    for pattern in patterns:
-        matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-        names.extend([match.group(1) for match in matches])
-    
-    return list(set(names))
-
-
-def search_existing_code(project_dir: str, function_names: List[str]) -> List[Tuple[str, str]]:
-    """Search for existing code with similar function/class names."""
+    """Extract function/class/component names from content, most distinctive first."""
+    names = {match.group(match.lastgroup) for match in FUNCTION_PATTERN.finditer(content)}
+    names = [name for name in names if len(name) >= MIN_NAME_LENGTH and name not in COMMON_NAMES]
+    
+    # Prefer PascalCase (components, classes, types) and longer names
+    names.sort(key=lambda name: (name[0].isupper(), len(name), name), reverse=True)
+    return names[:MAX_SEARCHED_NAMES]
+
+
+def find_indexed_definitions(index: sqlite3.Connection, function_names: List[str]) -> List[Tuple[str, str]]:
+    """Look up definitions of the given names in the symbol index."""
+    found_matches = []
+    for start in range(0, len(function_names), SEARCH_CHUNK_SIZE):
+        chunk = function_names[start:start + SEARCH_CHUNK_SIZE]
+        rows = index.execute(
+            f'SELECT DISTINCT name, path FROM symbols WHERE name IN ({",".join("?" * len(chunk))}) '
+            'ORDER BY name, path', chunk)
+        found_matches.extend(rows)
+    
+    return found_matches
+
+
+def parse_json_matches(lines: Iterator[bytes]) -> Iterator[Tuple[str, str]]:
+    """Demultiplex ripgrep --json output back to (name, path) for each definition match."""
+    for line in lines:
+        try:
+            record = json_loads(line)
+        except ValueError:
+            continue
+        if record.get("type") != "match":
+            continue
+        data = record["data"]
+        file_path = data["path"].get("text")
+        for submatch in data.get("submatches", []):
+            match_text = submatch["match"].get("text")
+            if file_path and match_text:
+                yield match_text.split()[-1], file_path
+
+
+def find_definitions(project_dir: str, function_names: List[str]) -> List[Tuple[str, str]]:
+    """Search the project for definitions of the given names with ripgrep."""
     found_matches = []
+    seen = set()
     
-    for name in function_names:
+    # One ripgrep pass per chunk of names instead of one process per name
+    for start in range(0, len(function_names), SEARCH_CHUNK_SIZE):
+        chunk = function_names[start:start + SEARCH_CHUNK_SIZE]
+        alternation = '|'.join(re.escape(name) for name in chunk)
+        # A single name can stop at the first hit in each file; several names need
+        # every match so the hits can be told apart
+        output_args = ['-l', '--max-count=1'] if len(chunk) == 1 else ['--json']
         try:
-            # Search for function/class definitions
-            result = subprocess.run([
-                'rg', '--type-add', 'code:*.{js,ts,tsx,jsx,py,java,go,rs,php}',
-                '--type', 'code', '-l',
-                f'(function\\s+{name}|class\\s+{name}|const\\s+{name}|def\\s+{name}|interface\\s+{name}|type\\s+{name})',
+            with contextlib.closing(rg_lines([
+                '--type-add', 'code:*.{js,ts,tsx,jsx,py,java,go,rs,php}',
+                '--type', 'code', f'--max-filesize={MAX_INDEXED_FILE_SIZE}', *output_args,
+                '-e', f'(?:function|class|const|def|interface|type)\\s+({alternation})\\b',
                 project_dir
-            ], capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0:
-                files = [f.strip() for f in result.stdout.split('\n') if f.strip()]
-                for file_path in files:
-                    found_matches.append((name, file_path))
-                    
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
+            ])) as lines:
+                if len(chunk) == 1:
+                    matches = [(chunk[0], os.fsdecode(file_path)) for file_path in lines]
+                else:
+                    matches = list(parse_json_matches(lines))
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, OSError):
             continue
+        
+        for match in matches:
+            if match not in seen:
+                seen.add(match)
+                found_matches.append(match)
     
     return found_matches
 
 
-def search_existing_configs(project_dir: str, file_path: str, content: str) -> List[Tuple[str, str]]:
+def search_existing_code(project_dir: str, function_names: List[str],
+                         index: Optional[sqlite3.Connection] = None) -> List[Tuple[str, str]]:
+    """Search for existing code with similar function/class names."""
+    if index is not None:
+        try:
+            return find_indexed_definitions(index, function_names)
+        except sqlite3.Error:
+            pass  # Fall back to searching with ripgrep
+    
+    return find_definitions(project_dir, function_names)
+
+
+def search_existing_configs(project_dir: str, file_path: str, content: str,
+                            index: Optional[sqlite3.Connection] = None) -> List[Tuple[str, str]]:
     """Search for existing configuration files or similar configs."""
     found_matches = []
     filename = Path(file_path).name
     
-    # Common config file patterns
-    config_patterns = [
-        r'\.json$', r'\.yaml$', r'\.yml$', r'\.toml$', r'\.ini$', r'\.cfg$',
-        r'\.env', r'config\.(js|ts)$', r'\.config\.(js|ts)$', r'rc$'
-    ]
-    
-    if any(re.search(pattern, filename, re.IGNORECASE) for pattern in config_patterns):
+    if is_config_file(filename):
         try:
             # Search for similar config files
-            base_name = re.sub(r'\.(json|yaml|yml|toml|ini|cfg|js|ts)$', '', filename, flags=re.IGNORECASE)
-            result = subprocess.run([
-                'rg', '--files', '--glob', f'*{base_name}*', project_dir
-            ], capture_output=True, text=True, timeout=10)
+            base_name = CONFIG_EXTENSION_PATTERN.sub('', filename)
+            files = None
+            if index is not None:
+                try:
+                    files = [path for path, in index.execute(
+                        'SELECT path FROM files WHERE instr(name, ?) > 0 ORDER BY path LIMIT 5', (base_name,))]
+                except sqlite3.Error:
+                    pass  # Fall back to searching with ripgrep
+            if files is None:
+                with contextlib.closing(rg_lines(['--files', '--glob', f'*{base_name}*', project_dir])) as lines:
+                    files = [os.fsdecode(line) for line in islice(lines, 5)]
             
-            if result.returncode == 0:
-                files = [f.strip() for f in result.stdout.split('\n') if f.strip()]
+            if files:
                 for existing_file in files[:5]:  # Limit to first 5 matches
                     if existing_file != file_path:
                         found_matches.append((f"Similar config: {base_name}", existing_file))
                         
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, OSError):
             pass
     
     return found_matches
@@ -155,14 +547,52 @@ def generate_search_message(similar_files: List[str], code_matches: List[Tuple[s
     return ""
 
 
-def main():
+def run_searches(project_dir: str, file_path: str,
+                 content: str) -> Tuple[List[str], List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Find similar files, existing definitions and similar configs for the content being written."""
+    # On slow filesystems only look for similarly named files near the project root
+    if is_slow_filesystem(project_dir):
+        return search_existing_files(project_dir, Path(file_path).name, max_depth=1), [], []
+    
+    # Bring the persistent index up to date; fall back to direct searches without it
+    index = open_index(project_dir)
     try:
-        # Load input from stdin
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
-        sys.exit(1)
+        if index is not None and not refresh_index(index, project_dir):
+            index.close()
+            index = None
+    except sqlite3.Error:
+        index.close()
+        index = None
+
+    # Extract function names from the content
+    function_names = extract_function_names(content)
+
+    # Index lookups are in-process, so run them directly on this thread
+    if index is not None:
+        try:
+            similar_files = search_existing_files(project_dir, Path(file_path).name, index)
+            code_matches = search_existing_code(project_dir, function_names, index) if function_names else []
+            config_matches = search_existing_configs(project_dir, file_path, content, index)
+        finally:
+            index.close()
+        return similar_files, code_matches, config_matches
+    
+    # Run the ripgrep searches concurrently since each blocks on its own subprocess
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        similar_files_future = executor.submit(search_existing_files, project_dir, Path(file_path).name)
+        code_matches_future = (executor.submit(search_existing_code, project_dir, function_names)
+                               if function_names else None)
+        config_matches_future = executor.submit(search_existing_configs, project_dir, file_path, content)
+        
+        similar_files = similar_files_future.result()
+        code_matches = code_matches_future.result() if code_matches_future else []
+        config_matches = config_matches_future.result()
+    
+    return similar_files, code_matches, config_matches
 
+
+def main(input_data: Dict[str, Any]) -> int:
+    """Run the duplicate check for one hook event and return the exit code."""
     # Get tool information
     tool_name = input_data.get("tool_name", "")
     tool_input = input_data.get("tool_input", {})
@@ -170,33 +600,25 @@ def main():
 
     # Only process Write, Edit, and MultiEdit tools
     if tool_name not in ["Write", "Edit", "MultiEdit"]:
-        sys.exit(0)
+        return 0
 
     file_path = tool_input.get("file_path", "")
     content = tool_input.get("content", "") or tool_input.get("new_string", "")
 
     if not file_path or not content:
-        sys.exit(0)
+        return 0
 
     # Skip if file path contains certain patterns (tests, temp files, etc.)
-    skip_patterns = [
-        r'/test/', r'/tests/', r'\.test\.', r'\.spec\.', 
-        r'/temp/', r'/tmp/', r'/node_modules/', r'/\.git/',
-        r'\.md$', r'\.txt$', r'\.log$'
-    ]
-    
-    if any(re.search(pattern, file_path, re.IGNORECASE) for pattern in skip_patterns):
-        sys.exit(0)
+    if SKIP_PATTERN.search(file_path) is not None:
+        return 0
 
-    # Search for existing similar files
-    similar_files = search_existing_files(project_dir, Path(file_path).name)
-    
-    # Extract and search for function names in the content
-    function_names = extract_function_names(content)
-    code_matches = search_existing_code(project_dir, function_names) if function_names else []
-    
-    # Search for similar configuration files
-    config_matches = search_existing_configs(project_dir, file_path, content)
+    # Skip small edits that define nothing before doing any filesystem work
+    if (len(content) < TRIVIAL_CONTENT_SIZE
+            and DEFINITION_KEYWORD_PATTERN.search(content) is None
+            and not is_config_file(Path(file_path).name)):
+        return 0
+
+    similar_files, code_matches, config_matches = run_searches(project_dir, file_path, content)
     
     # Generate warning message if duplicates found
     warning_message = generate_search_message(similar_files, code_matches, config_matches)
@@ -213,8 +635,15 @@ def main():
         print(json.dumps(output))
     
     # Allow the tool to proceed (exit code 0)
-    sys.exit(0)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        # Load input from stdin
+        hook_input = json_loads(sys.stdin.buffer.read())
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    sys.exit(main(hook_input))
@@ -3,11 +3,20 @@
 Test script for the prevent-duplicate-code hook
 """
 
+import contextlib
+import importlib.util
+import io
 import json
-import subprocess
 import sys
 import os
 
+# Load the hook once and call it in-process instead of starting an interpreter per test
+_spec = importlib.util.spec_from_file_location(
+    "prevent_duplicate_code", os.path.join(os.path.dirname(os.path.abspath(__file__)), "prevent-duplicate-code.py")
+)
+hook = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hook)
+
 def test_hook(tool_name, file_path, content):
     """Test the hook with sample data"""
     test_input = {
@@ -23,32 +32,29 @@ def test_hook(tool_name, file_path, content):
     }
     
     # Set the environment variable
-    env = os.environ.copy()
-    env["CLAUDE_PROJECT_DIR"] = os.getcwd()
+    os.environ["CLAUDE_PROJECT_DIR"] = os.getcwd()
     
     # Run the hook
+    stdout = io.StringIO()
+    stderr = io.StringIO()
     try:
-        result = subprocess.run([
-            "python3", ".claude/hooks/prevent-duplicate-code.py"
-        ], input=json.dumps(test_input), text=True, 
-        capture_output=True, env=env, timeout=10)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exit_code = hook.main(test_input)
         
-        print(f"Exit code: {result.returncode}")
-        if result.stdout:
-            print(f"Stdout: {result.stdout}")
-        if result.stderr:
-            print(f"Stderr: {result.stderr}")
+        print(f"Exit code: {exit_code}")
+        if stdout.getvalue():
+            print(f"Stdout: {stdout.getvalue()}")
+        if stderr.getvalue():
+            print(f"Stderr: {stderr.getvalue()}")
         
         # Try to parse JSON output
-        if result.stdout:
+        if stdout.getvalue():
             try:
-                output = json.loads(result.stdout)
+                output = json.loads(stdout.getvalue())
                 print(f"JSON output: {json.dumps(output, indent=2)}")
             except json.JSONDecodeError:
                 print("Output is not JSON")
         
-    except subprocess.TimeoutExpired:
-        print("Hook timed out")
     except Exception as e:
         print(f"Error running hook: {e}")
 